@@ -0,0 +1,254 @@
+import argparse
+import concurrent.futures
+import dataclasses
+import json
+import multiprocessing
+import os
+import re
+from dataclasses import dataclass, field
+from typing import *
+
+import smite as smite_
+from smite import BuildResult, Smite
+
+DEFAULT_SCENARIOS = ["squishy", "tank"]
+
+
+@dataclass
+class Job:
+    god: str
+    must_include_item_names: list[str] = field(default_factory=list)
+    build_size: int = 6
+    scenarios: list[str] = field(default_factory=lambda: list(DEFAULT_SCENARIOS))
+    weights: list[float] | None = None
+    name: str | None = None
+
+    def __post_init__(self):
+        # Match Smite.run_experiment so batch averages rank the same way.
+        if self.weights is None and self.scenarios == DEFAULT_SCENARIOS:
+            self.weights = list(smite_.squishy_tank_weights)
+
+    def get_filename(self) -> str:
+        name = self.name or "_".join(
+            [self.god]
+            + self.must_include_item_names
+            + [f"size{self.build_size}", "-".join(self.scenarios)]
+            + (["-".join(f"{x:g}" for x in self.weights)] if self.weights else [])
+        )
+        return re.sub(r"[^\w.-]+", "_", name) + ".json"
+
+    def get_group_key(self) -> tuple:
+        # Gods are compared by identity so aliases like amc and cern share work.
+        return (id(getattr(smite_, self.god)), self.build_size, tuple(self.scenarios))
+
+
+# Prepared once in the parent and inherited by forked workers.
+_smite: Smite | None = None
+
+
+def read_jobs_from_file(filename: str) -> list[Job]:
+    with open(filename, "r") as f:
+        jobs = [Job(**x) for x in json.load(f)]
+    for job in jobs:
+        if not isinstance(getattr(smite_, job.god, None), smite_.God):
+            raise ValueError(f"Could not find god by name {job.god}")
+        for scenario_name in job.scenarios:
+            if not isinstance(getattr(smite_, scenario_name, None), smite_.Scenario):
+                raise ValueError(f"Could not find scenario by name {scenario_name}")
+        if job.weights is not None and len(job.weights) != len(job.scenarios):
+            raise ValueError(f"Expected one weight per scenario in job {job}")
+    filenames = [x.get_filename() for x in jobs]
+    for filename in set(filenames):
+        if filenames.count(filename) > 1:
+            raise ValueError(f"Multiple jobs would write to {filename}")
+    return jobs
+
+
+def validate_jobs(smite: Smite, jobs: list[Job]):
+    for job in jobs:
+        if len(job.must_include_item_names) > job.build_size:
+            raise ValueError(f"Too many must include items in job {job}")
+        for item_name in job.must_include_item_names:
+            if item_name not in smite.items:
+                raise ValueError(f"Could not find item by name {item_name}")
+
+
+def group_jobs_into_tasks(smite: Smite, jobs: list[Job]) -> list[list[Job]]:
+    """Group jobs so each task enumerates builds once, for its first job.
+
+    A job joins a task when its must include items are the first job's plus
+    only non-starter items: its builds are then exactly the first job's builds
+    that contain those items. Extra starters would change which other starters
+    `generate_builds` allows, so such jobs get their own task.
+    """
+    tasks: list[list[Job]] = []
+    jobs_by_group: dict[tuple, list[Job]] = {}
+    for job in jobs:
+        jobs_by_group.setdefault(job.get_group_key(), []).append(job)
+    for group_jobs in jobs_by_group.values():
+        group_tasks: list[list[Job]] = []
+        for job in sorted(group_jobs, key=lambda x: len(x.must_include_item_names)):
+            for task in group_tasks:
+                base_item_names = set(task[0].must_include_item_names)
+                extra_item_names = set(job.must_include_item_names) - base_item_names
+                if base_item_names <= set(job.must_include_item_names) and not any(
+                    x in smite.starter_items for x in extra_item_names
+                ):
+                    task.append(job)
+                    break
+            else:
+                group_tasks.append([job])
+        tasks += group_tasks
+    return tasks
+
+
+def derive_build_results(
+    build_results: list[BuildResult], must_include_item_names: list[str]
+) -> list[BuildResult]:
+    derived_build_results = [
+        dataclasses.replace(x)
+        for x in build_results
+        if set(must_include_item_names) <= set(x.build)
+    ]
+    max_dps = max(x.dps for x in derived_build_results)
+    max_dpspg = max(x.dpspg for x in derived_build_results)
+    for build_result in derived_build_results:
+        build_result.dps_percent = build_result.dps / max_dps
+        build_result.dpspg_percent = build_result.dpspg / max_dpspg
+    return derived_build_results
+
+
+def prepare_smite(items_filename: str, gods_filename: str) -> Smite:
+    smite = Smite()
+    smite.read_items_from_file(items_filename)
+    smite.read_gods_from_file(gods_filename)
+    smite.prepare_items_raw()
+    smite.prepare_avg_hunter_stats()
+    smite.prepare_items()
+    return smite
+
+
+def init_worker(items_filename: str, gods_filename: str):
+    global _smite
+    if _smite is None:
+        _smite = prepare_smite(items_filename, gods_filename)
+
+
+def build_results_to_json(build_results: list[BuildResult], top_n: int) -> dict:
+    return {
+        sort_name: [
+            {
+                "build": x.build,
+                "price": x.build_item.price,
+                "dps": x.dps,
+                "dps_percent": x.dps_percent,
+                "dpspg": x.dpspg,
+                "dpspg_percent": x.dpspg_percent,
+            }
+            for x in Smite.sort_build_results(build_results, true_dps_false_dpspg)[
+                :top_n
+            ]
+        ]
+        for sort_name, true_dps_false_dpspg in (("dps", True), ("dpspg", False))
+    }
+
+
+def run_jobs(jobs: list[Job], output_dir: str, top_n: int) -> list[str]:
+    """Enumerate builds for the first job and filter them for the others."""
+    base_list_of_build_results = [
+        _smite.get_build_results(
+            scenario=getattr(smite_, scenario_name),
+            god=getattr(smite_, jobs[0].god),
+            must_include_item_names=jobs[0].must_include_item_names,
+            build_size=jobs[0].build_size,
+        )
+        for scenario_name in jobs[0].scenarios
+    ]
+    filenames = []
+    for job in jobs:
+        if set(job.must_include_item_names) == set(jobs[0].must_include_item_names):
+            list_of_build_results = base_list_of_build_results
+        else:
+            list_of_build_results = [
+                derive_build_results(build_results, job.must_include_item_names)
+                for build_results in base_list_of_build_results
+            ]
+        result = {
+            "job": job.__dict__,
+            "scenarios": {
+                scenario_name: build_results_to_json(build_results, top_n)
+                for scenario_name, build_results in zip(
+                    job.scenarios, list_of_build_results
+                )
+            },
+        }
+        if len(job.scenarios) > 1:
+            result["average"] = build_results_to_json(
+                Smite.average_build_results(list_of_build_results, job.weights),
+                top_n,
+            )
+        filename = os.path.join(output_dir, job.get_filename())
+        with open(filename, "w") as f:
+            f.write(json.dumps(result, indent=2))
+        filenames.append(filename)
+    return filenames
+
+
+def run_batch(
+    jobs: list[Job],
+    output_dir: str,
+    top_n: int = 20,
+    max_workers: int | None = None,
+    items_filename: str = "items.json",
+    gods_filename: str = "gods.json",
+) -> list[str]:
+    global _smite
+    # Prepared here to validate every job before any output is written.
+    _smite = prepare_smite(items_filename, gods_filename)
+    validate_jobs(_smite, jobs)
+    tasks = group_jobs_into_tasks(_smite, jobs)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = None
+    filenames = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=mp_context,
+        initializer=init_worker,
+        initargs=(items_filename, gods_filename),
+    ) as executor:
+        futures = [
+            executor.submit(run_jobs, task_jobs, output_dir, top_n)
+            for task_jobs in tasks
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            filenames += future.result()
+    return filenames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many experiments at once.")
+    parser.add_argument("job_file", help="JSON list of jobs")
+    parser.add_argument("output_dir")
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--items-file", default="items.json")
+    parser.add_argument("--gods-file", default="gods.json")
+    args = parser.parse_args()
+    filenames = run_batch(
+        jobs=read_jobs_from_file(args.job_file),
+        output_dir=args.output_dir,
+        top_n=args.top_n,
+        max_workers=args.max_workers,
+        items_filename=args.items_file,
+        gods_filename=args.gods_file,
+    )
+    for filename in sorted(filenames):
+        print(filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -99,7 +99,11 @@ class Item:
             child_item = all_items_by_id[child_item_id]
             price += child_item["Price"]
             child_item_id = child_item["ChildItemId"]
-        item = cls(passive=passives_map.get(item_raw["DeviceName"]), price=price)
+        item = cls(
+            passive=passives_map.get(item_raw["DeviceName"])
+            or hybrid_passives_map.get(item_raw["DeviceName"]),
+            price=price,
+        )
         for stat in item_raw["ItemDescription"]["Menuitems"]:
             stat_name: str = stat["Description"]
             stat_value: str = stat["Value"]
@@ -112,7 +116,7 @@ class Item:
                     item.critical_strike_chance += int(stat_value[:-1]) / 100
                 case "Physical Critical Strike Chance":
                     item.critical_strike_chance += int(stat_value[:-1]) / 100
-                case "Physical Penetration":
+                case "Physical Penetration" | "Penetration":
                     if stat_value.endswith("%"):
                         item.percent_pen += int(stat_value[:-1]) / 100
                     else:
@@ -237,12 +241,18 @@ def ichaival(scenario: Scenario, _: God, build: Item):
 
 @functools.lru_cache
 def ichaival_inner(approx_aa_cnt: int):
+    power_on_each_auto = ichaival_power_on_each_auto(approx_aa_cnt)
+    return sum(power_on_each_auto) / len(power_on_each_auto)
+
+
+@functools.lru_cache
+def ichaival_power_on_each_auto(approx_aa_cnt: int) -> tuple[int, ...]:
     power_on_each_auto = [0]
     power = 0
     for i in range(1, approx_aa_cnt):
         power = min(30, power + 10)
         power_on_each_auto.append(power)
-    return sum(power_on_each_auto) / len(power_on_each_auto)
+    return tuple(power_on_each_auto)
 
 
 def odysseus_bow(scenario: Scenario, _: God, build: Item):
@@ -276,12 +286,18 @@ def the_executioner(scenario: Scenario, _: God, build: Item):
 
 @functools.lru_cache
 def the_executioner_inner(approx_aa_cnt: int):
+    pen_on_each_auto = the_executioner_pen_on_each_auto(approx_aa_cnt)
+    return sum(pen_on_each_auto) / len(pen_on_each_auto)
+
+
+@functools.lru_cache
+def the_executioner_pen_on_each_auto(approx_aa_cnt: int) -> tuple[float, ...]:
     pen_on_each_auto = [0]
     pen = 0
     for i in range(1, approx_aa_cnt):
         pen = min(0.28, pen + 0.07)
         pen_on_each_auto.append(pen)
-    return sum(pen_on_each_auto) / len(pen_on_each_auto)
+    return tuple(pen_on_each_auto)
 
 
 def titans_bane(__: Scenario, _: God, build: Item):
@@ -294,10 +310,61 @@ def wind_demon(scenario: Scenario, _: God, build: Item):
     aa_cnt_before_crit = round(1 / build.critical_strike_chance)
     aa_cnt_after_crit = max(0, scenario.approx_aa_cnt - aa_cnt_before_crit)
     uptime = aa_cnt_after_crit / scenario.approx_aa_cnt
+    wind_demon_inner(build, uptime)
+
+
+def wind_demon_inner(build: Item, uptime: float):
     build.percent_pen += 0.1 * uptime
     build.attack_speed += 0.1 * uptime
 
 
+def gladiators_shield(scenario: Scenario, _: God, build: Item):
+    # Protections are not tracked, so only the shield's own 40 count.
+    build.yellow_ability_damage += scenario.approx_ability_cnt * (15 + 0.35 * 40)
+
+
+def griffonwing_earrings(__: Scenario, _: God, build: Item):
+    build.basic_attack_multiplier -= 0.15
+
+
+def ring_of_hecate(scenario: Scenario, _: God, build: Item):
+    build.physical_power = round(
+        build.physical_power * (1 + ring_of_hecate_inner(scenario.approx_aa_cnt))
+    )
+
+
+@functools.lru_cache
+def ring_of_hecate_inner(approx_aa_cnt: int):
+    power_percent_on_each_auto = [0]
+    power_percent = 0
+    for i in range(1, approx_aa_cnt):
+        power_percent = min(0.15, power_percent + 0.05)
+        power_percent_on_each_auto.append(power_percent)
+    return sum(power_percent_on_each_auto) / len(power_percent_on_each_auto)
+
+
+def shifters_shield(scenario: Scenario, _: God, build: Item):
+    # Assume we stay over 75% health in a short fight against a squishy.
+    if scenario.true_squishy_false_tank:
+        build.physical_power += 25
+
+
+def sphinxs_bauble(__: Scenario, _: God, build: Item):
+    build.basic_attack_multiplier = (1 + build.basic_attack_multiplier) * 0.8 - 1
+    build.yellow_aa_damage *= 0.8
+    build.yellow_ability_damage *= 0.8
+
+
+def telkhines_ring(__: Scenario, _: God, build: Item):
+    # Magical power is not tracked, so only the ring's own 90 count.
+    build.yellow_aa_damage += 10 + 0.1 * 90
+
+
+def void_shield(__: Scenario, _: God, build: Item):
+    build.aa_percent_pen += 0.15
+    build.ability_percent_pen += 0.15
+
+
 @dataclass
 class Passive:
     compute: Callable[[Scenario, God, Item], None]
@@ -337,3 +404,24 @@ passives_map = {
     "Titan's Bane": Passive(titans_bane, 1),
     "Wind Demon": Passive(wind_demon, 20),  # CRIT > AS, PEN
 }
+
+# Only used with Smite.prepare_items_raw(include_hybrid_items=True).
+hybrid_passives_map = {
+    "Ancile": None,
+    "Blackthorn Hammer": None,
+    "Caduceus Shield": None,
+    "Demonic Grip": None,
+    "Frostbound Hammer": None,
+    "Gladiator's Shield": Passive(gladiators_shield, 1),
+    "Griffonwing Earrings": Passive(griffonwing_earrings, 1),
+    "Hastened Ring": None,
+    "Ring of Hecate": Passive(ring_of_hecate, 40),  # POWER > POWER
+    "Runeforged Hammer": None,
+    "Runic Shield": None,
+    "Shifter's Shield": Passive(shifters_shield, 1),
+    "Sphinx's Bauble": Passive(sphinxs_bauble, 60),  # DMG > DMG
+    "Telkhines Ring": Passive(telkhines_ring, 1),
+    "The Sledge": None,
+    "Toxic Blade": None,
+    "Void Shield": Passive(void_shield, 1),
+}
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import *
+
+import numpy as np
+
+from item import (
+    God,
+    Item,
+    Scenario,
+    ichaival,
+    ichaival_power_on_each_auto,
+    the_executioner,
+    the_executioner_pen_on_each_auto,
+    wind_demon,
+    wind_demon_inner,
+)
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass
+class SimulationResult:
+    build: list[str]
+    dps_mean: float
+    dps_percentiles: dict[int, float]
+    kill_probability: float
+
+    def __repr__(self):
+        percentiles = "\n".join(
+            f"  P{percentile}: {dps:.2f}"
+            for percentile, dps in self.dps_percentiles.items()
+        )
+        return (
+            f"Items:\n"
+            f"  {', '.join(self.build)}\n"
+            f"Kill probability: {self.kill_probability:.2%}\n"
+            f"DPS mean: {self.dps_mean:.2f}\n"
+            f"{percentiles}\n"
+            "-----------------------------"
+        )
+
+
+def get_passive_overrides(
+    approx_aa_cnt: int, aa_i: int, is_wind_demon_active: bool
+) -> dict[Callable, Callable]:
+    # Replaces the averaged stacking passives with their exact state on one auto.
+    def ichaival_on_auto(_: Scenario, __: God, build: Item):
+        build.physical_power += ichaival_power_on_each_auto(approx_aa_cnt)[aa_i]
+
+    def the_executioner_on_auto(_: Scenario, __: God, build: Item):
+        build.aa_percent_pen += the_executioner_pen_on_each_auto(approx_aa_cnt)[aa_i]
+
+    def wind_demon_on_auto(_: Scenario, __: God, build: Item):
+        wind_demon_inner(build, 1 if is_wind_demon_active else 0)
+
+    return {
+        ichaival: ichaival_on_auto,
+        the_executioner: the_executioner_on_auto,
+        wind_demon: wind_demon_on_auto,
+    }
+
+
+def simulate_dps(
+    dps_table: np.ndarray,
+    critical_strike_chance: np.ndarray,
+    has_wind_demon: np.ndarray,
+    fight_cnt: int,
+    rng: np.random.Generator,
+    chunk_size: int = 256,
+) -> np.ndarray:
+    """Simulate `fight_cnt` fights for every build at once.
+
+    `dps_table` has shape (builds, wind demon inactive/active, autos, no crit/crit)
+    and holds the DPS the build would have if every auto looked like that one.
+    A fight's DPS is the mean over its autos. The expected value only matches
+    `Item.compute_dps` for builds without Ichaival, The Executioner or Wind
+    Demon, whose averaged stacks it replaces. Returns an array of shape
+    (builds, fights).
+    """
+    build_cnt, _, aa_cnt, _ = dps_table.shape
+    dps = np.empty((build_cnt, fight_cnt))
+    aa_i = np.arange(aa_cnt)[None, None, :]
+    for start in range(0, build_cnt, chunk_size):
+        stop = min(start + chunk_size, build_cnt)
+        crits = (
+            rng.random((stop - start, fight_cnt, aa_cnt))
+            < critical_strike_chance[start:stop, None, :]
+        )
+        # Wind Demon procs on the first crit and buffs every auto after it.
+        crits_before = np.cumsum(crits, axis=2) - crits
+        is_wind_demon_active = (crits_before > 0) & has_wind_demon[
+            start:stop, None, None
+        ]
+        build_i = np.arange(start, stop)[:, None, None]
+        dps_on_each_auto = dps_table[
+            build_i,
+            is_wind_demon_active.astype(np.intp),
+            aa_i,
+            crits.astype(np.intp),
+        ]
+        dps[start:stop] = dps_on_each_auto.mean(axis=2)
+    return dps
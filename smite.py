@@ -1,12 +1,21 @@
+import dataclasses
 import itertools
 import json
+import time
 from dataclasses import dataclass
 from typing import *
 
 import charybdis as charybdis_
+import numpy as np
 from tqdm import tqdm
 
-from item import God, Item, Scenario, passives_map
+from item import God, Item, Scenario, hybrid_passives_map, passives_map, wind_demon
+from simulation import (
+    DEFAULT_PERCENTILES,
+    SimulationResult,
+    get_passive_overrides,
+    simulate_dps,
+)
 
 squishy = Scenario(
     fight_length=2,
@@ -28,6 +37,8 @@ tank = Scenario(
     true_squishy_false_tank=False,
 )
 
+squishy_tank_weights = [3, 2]
+
 amc = God(aa_stim=0, aa_stim_length=0, is_failnot_good=True)
 anhur = God(aa_stim=0, aa_stim_length=0, is_failnot_good=False)
 apollo = God(aa_stim=1, aa_stim_length=-5, is_failnot_good=True)
@@ -99,6 +110,46 @@ class BuildResult:
         )
 
 
+@dataclass
+class SearchProgress:
+    build_results: list[BuildResult]
+    beam_width: int
+    elapsed: float
+    upper_bound: float | None = None
+    gap: float | None = None
+
+    def __repr__(self):
+        gap = f"{self.gap:.2%}" if self.gap is not None else "unknown"
+        return (
+            f"Beam width: {self.beam_width}"
+            f" Elapsed: {self.elapsed:.1f}s"
+            f" Best DPS: {self.build_results[0].dps:.2f}"
+            f" Gap: {gap}"
+        )
+
+
+@dataclass
+class PurchaseOrderResult:
+    build: list[str]
+    auc_dps: float
+    dps_on_each_purchase: list[float]
+    minute_on_each_purchase: list[float]
+
+    def __repr__(self):
+        purchases = "\n".join(
+            f"  {minute:5.1f}m {item_name} ({dps:.2f})"
+            for item_name, dps, minute in zip(
+                self.build, self.dps_on_each_purchase, self.minute_on_each_purchase
+            )
+        )
+        return (
+            f"Purchase order:\n"
+            f"{purchases}\n"
+            f"AUC DPS: {self.auc_dps:.2f}\n"
+            "-----------------------------"
+        )
+
+
 @dataclass
 class Experiment:
     dps_squishy: List[BuildResult]
@@ -122,6 +173,7 @@ class Smite:
         self.normal_items: dict | None = None
         self.items_raw: dict | None = None
         self.items: dict[str, Item] | None = None
+        self.include_hybrid_items: bool = False
 
     def save_items_to_file(self, filename: str = "items.json"):
         self.all_items = self.api.call_method("getitems", "1")
@@ -141,7 +193,10 @@ class Smite:
         with open(filename, "r") as f:
             self.all_gods = json.load(f)
 
-    def prepare_items_raw(self):
+    def prepare_items_raw(self, include_hybrid_items: bool = False):
+        # Hybrid items still need physical power or attack speed, so purely
+        # defensive or magical items are dropped either way.
+        self.include_hybrid_items = include_hybrid_items
         self.all_items_by_id = {x["ItemId"]: x for x in self.all_items}
         self.starter_items = []
         self.normal_items = []
@@ -179,7 +234,7 @@ class Smite:
                         has_prots_or_health_or_mag_power = True
                     case "Magical Power":
                         has_prots_or_health_or_mag_power = True
-            if has_prots_or_health_or_mag_power:
+            if has_prots_or_health_or_mag_power and not include_hybrid_items:
                 continue
             elif has_phys_power_or_as:
                 self.normal_items.append(item)
@@ -241,6 +296,8 @@ class Smite:
     def prepare_items(self):
         self.items = {}
         passives_check = set(passives_map.keys())
+        if self.include_hybrid_items:
+            passives_check |= hybrid_passives_map.keys()
         for item_name, item_raw in self.items_raw.items():
             self.items[item_name] = Item.from_item_raw(item_raw, self.all_items_by_id)
             if (
@@ -273,6 +330,46 @@ class Smite:
             for p in itertools.product(*c):
                 yield must_include_item_names + list(p)
 
+    def compute_build_item(
+        self,
+        scenario: Scenario,
+        god: God,
+        build: Iterable[str],
+        passive_overrides: dict[Callable, Callable] | None = None,
+    ) -> Item:
+        build_item = Item(
+            basic_attack=self.avg_hunter_basic_attack,
+            attack_speed=self.avg_hunter_attack_speed
+            + god.aa_stim / (1 if god.aa_stim_length == 0 else 2),
+            critical_strike_multiplier=-scenario.spectral_armor,
+        )
+
+        passives = []
+        for item_name in build:
+            item = self.items[item_name]
+            build_item += item
+            if item.passive is not None:
+                passives.append(item.passive)
+        for passive in sorted(passives, key=lambda x: x.phase):
+            compute = passive.compute
+            if passive_overrides is not None:
+                compute = passive_overrides.get(compute, compute)
+            compute(scenario, god, build_item)
+        return build_item
+
+    def compute_build_dps(
+        self,
+        scenario: Scenario,
+        god: God,
+        build: frozenset[str],
+        cache: dict[frozenset[str], float],
+    ) -> float:
+        if build not in cache:
+            cache[build] = self.compute_build_item(scenario, god, build).compute_dps(
+                fight_length=scenario.fight_length, enemy_prots=scenario.enemy_prots
+            )
+        return cache[build]
+
     def get_build_results(
         self,
         scenario: Scenario,
@@ -286,22 +383,7 @@ class Smite:
         for build in tqdm(
             list(self.generate_builds(must_include_item_names, build_size))
         ):
-            build_item = Item(
-                basic_attack=self.avg_hunter_basic_attack,
-                attack_speed=self.avg_hunter_attack_speed
-                + god.aa_stim / (1 if god.aa_stim_length == 0 else 2),
-                critical_strike_multiplier=-scenario.spectral_armor,
-            )
-
-            passives = []
-            for item_name in build:
-                item = self.items[item_name]
-                build_item += item
-                if item.passive is not None:
-                    passives.append(item.passive)
-            for passive in sorted(passives, key=lambda x: x.phase):
-                passive.compute(scenario, god, build_item)
-
+            build_item = self.compute_build_item(scenario, god, build)
             dps = build_item.compute_dps(
                 fight_length=scenario.fight_length, enemy_prots=scenario.enemy_prots
             )
@@ -323,6 +405,251 @@ class Smite:
             build_result.dpspg_percent = build_result.dpspg / max_dpspg
         return build_results
 
+    def search_builds(
+        self,
+        scenario: Scenario,
+        god: God,
+        must_include_item_names: list[str],
+        build_size: int = 6,
+        starter_slot_cnt: int = 1,
+        time_budget: float = 10.0,
+        top_n: int = 10,
+    ) -> Iterator[SearchProgress]:
+        """Beam search over `items_raw`, doubling the beam width each round.
+
+        The first round (width 1) is the greedy build. A `SearchProgress` is
+        yielded whenever a round improves the best DPS, until `time_budget`
+        seconds pass or a round runs without pruning, which makes it exact. That
+        last round is always yielded, with an upper bound equal to its best DPS
+        and a gap of 0. Before that the upper bound and gap are unknown.
+        """
+        if len(must_include_item_names) > build_size:
+            raise ValueError("Too many must include items")
+        for item_name in must_include_item_names:
+            if item_name not in self.items:
+                raise ValueError(f"Could not find item by name {item_name}")
+        if (
+            sum(x in self.starter_items for x in must_include_item_names)
+            > starter_slot_cnt
+        ):
+            raise ValueError("Too many must include starter items")
+        candidate_item_names = [
+            x for x in self.items_raw.keys() if x not in must_include_item_names
+        ]
+
+        start_time = time.monotonic()
+        deadline = start_time + time_budget
+        scores: dict[frozenset[str], float] = {}
+
+        def score(build: frozenset[str]) -> float:
+            return self.compute_build_dps(scenario, god, build, scores)
+
+        best_dps = 0.0
+        beam_width = 1
+        while True:
+            beam = [frozenset(must_include_item_names)]
+            is_pruned = False
+            for _ in range(build_size - len(must_include_item_names)):
+                if time.monotonic() > deadline:
+                    return
+                next_beam = set()
+                for build in beam:
+                    starter_cnt = sum(x in self.starter_items for x in build)
+                    for item_name in candidate_item_names:
+                        if item_name in build:
+                            continue
+                        if (
+                            item_name in self.starter_items
+                            and starter_cnt >= starter_slot_cnt
+                        ):
+                            continue
+                        next_beam.add(build | {item_name})
+                beam = sorted(next_beam, key=score, reverse=True)
+                if len(beam) > beam_width:
+                    beam = beam[:beam_width]
+                    is_pruned = True
+
+            is_improved = bool(beam) and score(beam[0]) > best_dps
+            if is_improved or not is_pruned:
+                best_dps = max(best_dps, score(beam[0]) if beam else 0.0)
+                build_results = []
+                for build in beam[:top_n]:
+                    build_item = self.compute_build_item(scenario, god, build)
+                    build_results.append(
+                        BuildResult(
+                            build=sorted(build),
+                            build_item=build_item,
+                            dps=score(build),
+                            dps_percent=score(build) / best_dps,
+                            dpspg=score(build) / build_item.price,
+                            dpspg_percent=1,
+                            parent_results=[],
+                        )
+                    )
+                max_dpspg = max((x.dpspg for x in build_results), default=0.0)
+                for build_result in build_results:
+                    build_result.dpspg_percent = build_result.dpspg / max_dpspg
+                yield SearchProgress(
+                    build_results=build_results,
+                    beam_width=beam_width,
+                    elapsed=time.monotonic() - start_time,
+                    upper_bound=best_dps if not is_pruned else None,
+                    gap=0.0 if not is_pruned else None,
+                )
+            if not is_pruned:
+                return
+            beam_width *= 2
+
+    def get_purchase_order_results(
+        self,
+        scenario: Scenario,
+        god: God,
+        builds: Iterable[list[str]],
+        starting_gold: int = 1500,
+        gold_per_minute: int = 700,
+        horizon_minutes: float | None = None,
+    ) -> list[PurchaseOrderResult]:
+        """Find the purchase order of each build with the best time-averaged DPS.
+
+        Gold comes in linearly, so the minute a set of items is finished only
+        depends on its total price, not on the order. That makes the area under
+        the DPS curve a DP over item subsets, with partial build scores memoized
+        across all builds. The horizon defaults to when the priciest build is
+        finished so every build is averaged over the same timeline. Purchases
+        after the horizon do not count.
+        """
+        builds = list(builds)
+        scores: dict[frozenset[str], float] = {}
+
+        def score(build: frozenset[str]) -> float:
+            return self.compute_build_dps(scenario, god, build, scores)
+
+        def minute(build: frozenset[str]) -> float:
+            price = sum(self.items[x].price for x in build)
+            return max(0.0, (price - starting_gold) / gold_per_minute)
+
+        if horizon_minutes is None:
+            horizon_minutes = max((minute(frozenset(x)) for x in builds), default=0)
+
+        purchase_order_results = []
+        for build in tqdm(builds):
+            # Best area so far and the order reaching it, for every subset.
+            best: dict[frozenset[str], tuple[float, list[str]]] = {
+                frozenset(): (0.0, [])
+            }
+            for subset_size in range(len(build)):
+                next_best = {}
+                for subset, (area, order) in best.items():
+                    subset_minute = min(minute(subset), horizon_minutes)
+                    for item_name in build:
+                        if item_name in subset:
+                            continue
+                        next_subset = subset | {item_name}
+                        next_area = area + score(subset) * (
+                            min(minute(next_subset), horizon_minutes) - subset_minute
+                        )
+                        if (
+                            next_subset not in next_best
+                            or next_area > next_best[next_subset][0]
+                        ):
+                            next_best[next_subset] = (next_area, order + [item_name])
+                best = next_best
+
+            full_build = frozenset(build)
+            area, order = best[full_build]
+            if horizon_minutes > 0:
+                area += score(full_build) * (
+                    horizon_minutes - min(minute(full_build), horizon_minutes)
+                )
+                auc_dps = area / horizon_minutes
+            else:
+                auc_dps = score(full_build)
+            purchase_order_results.append(
+                PurchaseOrderResult(
+                    build=order,
+                    auc_dps=auc_dps,
+                    dps_on_each_purchase=[
+                        score(frozenset(order[: i + 1])) for i in range(len(order))
+                    ],
+                    minute_on_each_purchase=[
+                        minute(frozenset(order[: i + 1])) for i in range(len(order))
+                    ],
+                )
+            )
+        return purchase_order_results
+
+    def get_simulation_results(
+        self,
+        scenario: Scenario,
+        god: God,
+        builds: Iterable[list[str]],
+        fight_cnt: int = 1000,
+        percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+        seed: int | None = None,
+    ) -> list[SimulationResult]:
+        builds = list(builds)
+        aa_cnt = max(1, scenario.approx_aa_cnt)
+        dps_table = np.empty((len(builds), 2, aa_cnt, 2))
+        critical_strike_chance = np.empty((len(builds), aa_cnt))
+        has_wind_demon = np.empty(len(builds), dtype=bool)
+        for build_i, build in enumerate(tqdm(builds)):
+            has_wind_demon[build_i] = any(
+                self.items[x].passive is not None
+                and self.items[x].passive.compute is wind_demon
+                for x in build
+            )
+            for is_wind_demon_active in (False, True):
+                if is_wind_demon_active and not has_wind_demon[build_i]:
+                    # Never indexed, but keep the table free of garbage.
+                    dps_table[build_i, 1] = dps_table[build_i, 0]
+                    continue
+                for aa_i in range(aa_cnt):
+                    build_item = self.compute_build_item(
+                        scenario,
+                        god,
+                        build,
+                        passive_overrides=get_passive_overrides(
+                            scenario.approx_aa_cnt, aa_i, is_wind_demon_active
+                        ),
+                    )
+                    if not is_wind_demon_active:
+                        critical_strike_chance[build_i, aa_i] = min(
+                            max(build_item.critical_strike_chance, 0), 1
+                        )
+                    for is_crit in (False, True):
+                        dps_table[
+                            build_i, int(is_wind_demon_active), aa_i, int(is_crit)
+                        ] = dataclasses.replace(
+                            build_item, critical_strike_chance=float(is_crit)
+                        ).compute_dps(
+                            fight_length=scenario.fight_length,
+                            enemy_prots=scenario.enemy_prots,
+                        )
+
+        dps = simulate_dps(
+            dps_table=dps_table,
+            critical_strike_chance=critical_strike_chance,
+            has_wind_demon=has_wind_demon,
+            fight_cnt=fight_cnt,
+            rng=np.random.default_rng(seed),
+        )
+        dps_percentiles = np.percentile(dps, percentiles, axis=1)
+        kill_probability = np.mean(
+            dps * scenario.fight_length >= scenario.enemy_health, axis=1
+        )
+        return [
+            SimulationResult(
+                build=build,
+                dps_mean=float(dps[build_i].mean()),
+                dps_percentiles={
+                    percentile: float(dps_percentiles[percentile_i, build_i])
+                    for percentile_i, percentile in enumerate(percentiles)
+                },
+                kill_probability=float(kill_probability[build_i]),
+            )
+            for build_i, build in enumerate(builds)
+        ]
+
     @staticmethod
     def average_build_results(
         list_of_build_results: Sequence[list[BuildResult]],
@@ -372,7 +699,7 @@ class Smite:
             build_size=build_size,
         )
         build_results_both = self.average_build_results(
-            [build_results_squishy, build_results_tank], weights=[3, 2]
+            [build_results_squishy, build_results_tank], weights=squishy_tank_weights
         )
         return Experiment(
             dps_squishy=self.sort_build_results(build_results_squishy, True),